@@ -18,11 +18,13 @@ STOPWORDS = {
     "beni", "başka", "kadar", "sonra", "önce", "şimdi", "hala", "bile",
 }
 
+_NON_WORD_RE = re.compile(r"[^\w\sçğıöşü]")
+
 
 def tokenize_tr(text: str) -> List[str]:
     """Tokenize Turkish text into lowercased words (4+ chars, no stopwords)."""
     t = text.lower()
-    t = re.sub(r"[^\w\sçğıöşü]", " ", t)
+    t = _NON_WORD_RE.sub(" ", t)
     return [w for w in t.split() if len(w) >= 4 and w not in STOPWORDS]
 
 
@@ -40,17 +42,15 @@ def suggest_synonyms_from_down_sessions(
 
     for s in sessions:
         text = s.get("input_text") or ""
-        canonicals = set(c.lower() for c in (s.get("user_canonicals_tr") or []))
-        tokens = tokenize_tr(text)
-
-        for tok in tokens:
-            if tok not in canonicals:
-                counter[tok] += 1
+        canonicals = {c.lower() for c in (s.get("user_canonicals_tr") or [])}
+        # Counter.update counts an iterable in C rather than one += per token.
+        counter.update(tok for tok in tokenize_tr(text) if tok not in canonicals)
 
-    suggestions = []
-    for tok, cnt in counter.items():
-        if cnt >= min_count:
-            suggestions.append({"token": tok, "support_count": cnt})
+    suggestions = [
+        {"token": tok, "support_count": cnt}
+        for tok, cnt in counter.items()
+        if cnt >= min_count
+    ]
 
     return sorted(suggestions, key=lambda x: x["support_count"], reverse=True)
 
@@ -63,11 +63,31 @@ def map_token_to_canonical(
     Heuristic: if token co-occurs with a canonical across sessions,
     the most frequent co-occurring canonical is the likely mapping.
     """
-    freq: Counter = Counter()
-    for s in sessions:
-        if token in (s.get("input_text") or "").lower():
-            for c in s.get("user_canonicals_tr") or []:
-                freq[c.lower()] += 1
-    if not freq:
-        return None
-    return freq.most_common(1)[0][0]
+    return map_tokens_to_canonicals([token], sessions)[token]
+
+
+def map_tokens_to_canonicals(
+    tokens: List[str],
+    sessions: List[Dict[str, Any]],
+) -> Dict[str, Optional[str]]:
+    """
+    Batch form of map_token_to_canonical.
+
+    Session text and canonicals are lowercased once up front instead of
+    once per token. Sessions without canonicals can never contribute a
+    mapping, so they are dropped before the token x session scan.
+    """
+    prepared = [
+        ((s.get("input_text") or "").lower(), [c.lower() for c in canonicals])
+        for s in sessions
+        if (canonicals := s.get("user_canonicals_tr"))
+    ]
+
+    mapped: Dict[str, Optional[str]] = {}
+    for token in tokens:
+        freq: Counter = Counter()
+        for text, canonicals in prepared:
+            if token in text:
+                freq.update(canonicals)
+        mapped[token] = freq.most_common(1)[0][0] if freq else None
+    return mapped
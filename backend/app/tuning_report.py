@@ -0,0 +1,356 @@
+"""Tuning report queries — shared by scripts/tuning_report.py and
+scripts/tuning_report_upload.py.
+
+Aggregates (all over triage_sessions created since a given instant):
+  1. Top "down" feedback examples
+  2. stop_reason breakdown
+  3. Feedback rating counts
+  4. Specialty-level down rate (most critical for tuning)
+  5. Most asked canonical questions
+  6. Confidence distribution
+  7. Low-confidence raw text samples (synonym/mapping gap hints)
+
+Statements live at module scope so a long-lived connection sees the same
+text every run and can reuse its prepared plans.
+
+Before reading, build_report fills the triage_daily_canonicals rollup, which
+writes and commits. The fill recomputes only the last week of settled days;
+older rollup days do not see later session updates or deletes (see
+triage_fill_daily_canonicals in the schema for a full rebuild). On a read-only role or replica, or with
+TUNING_REPORT_READ_ONLY=1, it skips the fill and computes most asked
+canonicals live over the whole window instead.
+"""
+
+from __future__ import annotations
+import os
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import psycopg
+from psycopg import errors as pg_errors
+from psycopg.rows import dict_row
+
+
+# Rolls settled UTC days of the window (older than yesterday) into
+# triage_daily_canonicals so most_asked_canonicals only reads the edges live.
+# Takes (since, cutoff_day); the cutoff is fixed once per run in Python so the
+# fill and the read agree even when the run crosses UTC midnight.
+SQL_FILL_DAILY_CANONICALS = """
+SELECT public.triage_fill_daily_canonicals(
+  timezone('UTC', %s::timestamptz)::date + 1,
+  %s::date
+);
+"""
+
+# Read-only fallback for most_asked_canonicals: the whole window, read live.
+SQL_MOST_ASKED_CANONICALS_LIVE = """
+SELECT canonical, COUNT(*)::bigint AS cnt
+FROM triage_session_canonicals
+WHERE created_at >= %s
+GROUP BY canonical
+ORDER BY cnt DESC
+LIMIT %s;
+"""
+
+# (report key, SQL, default LIMIT or None). Every statement takes the window
+# start as its first parameter, followed by the LIMIT when there is one;
+# most_asked_canonicals also takes the rollup cutoff day in between. All of
+# them are independent, so they are sent as one pipeline.
+SQL_STATEMENTS: List[Tuple[str, str, Optional[int]]] = [
+    # 1) Down feedback examples
+    (
+        "down_examples",
+        """
+        SELECT
+          s.id AS session_id,
+          s.created_at,
+          s.input_text,
+          s.recommended_specialty_id,
+          s.recommended_specialty_tr,
+          s.confidence_0_1,
+          s.confidence_label_tr,
+          s.stop_reason,
+          s.top_conditions,
+          s.user_canonicals_tr,
+          f.comment
+        FROM triage_feedback f
+        JOIN triage_sessions s ON s.id = f.session_id
+        WHERE f.rating = 'down'
+          AND s.created_at >= %s
+        ORDER BY s.created_at DESC
+        LIMIT %s;
+        """,
+        20,
+    ),
+    # 2) stop_reason breakdown
+    (
+        "stop_reason_breakdown",
+        """
+        SELECT
+          COALESCE(stop_reason, 'NULL') AS stop_reason,
+          COUNT(*) AS cnt,
+          AVG(confidence_0_1) AS avg_conf,
+          COUNT(*) FILTER (WHERE confidence_0_1 IS NULL) AS null_conf_cnt
+        FROM triage_sessions
+        WHERE created_at >= %s
+          AND envelope_type IN ('RESULT', 'EMERGENCY')
+        GROUP BY 1
+        ORDER BY cnt DESC;
+        """,
+        None,
+    ),
+    # 3) Feedback rating counts
+    (
+        "feedback_counts",
+        """
+        SELECT rating, COUNT(*) AS cnt
+        FROM triage_feedback
+        WHERE created_at >= %s
+        GROUP BY rating
+        ORDER BY cnt DESC;
+        """,
+        None,
+    ),
+    # 4) Specialty-level down rate (most critical tuning list)
+    (
+        "specialty_down_rate",
+        """
+        WITH sessions AS (
+          SELECT s.id, s.recommended_specialty_id AS specialty_id
+          FROM triage_sessions s
+          WHERE s.created_at >= %s
+            AND s.envelope_type = 'RESULT'
+        ),
+        -- Inner join: only sessions that actually have feedback are touched.
+        rated AS (
+          SELECT
+            ss.specialty_id,
+            COUNT(*) FILTER (WHERE f.rating = 'down') AS down_cnt,
+            COUNT(*) FILTER (WHERE f.rating = 'up')   AS up_cnt
+          FROM sessions ss
+          JOIN triage_feedback f ON f.session_id = ss.id
+          GROUP BY 1
+        ),
+        -- Specialties with sessions but no feedback are still listed at 0.
+        base AS (
+          SELECT
+            sp.specialty_id,
+            COALESCE(r.down_cnt, 0) AS down_cnt,
+            COALESCE(r.up_cnt, 0)   AS up_cnt
+          FROM (SELECT DISTINCT specialty_id FROM sessions) sp
+          LEFT JOIN rated r ON r.specialty_id IS NOT DISTINCT FROM sp.specialty_id
+        )
+        SELECT
+          specialty_id,
+          down_cnt,
+          up_cnt,
+          CASE WHEN (down_cnt + up_cnt) = 0 THEN 0
+               ELSE ROUND((down_cnt::numeric / (down_cnt + up_cnt)) * 100, 2)
+          END AS down_rate_pct
+        FROM base
+        ORDER BY down_rate_pct DESC, down_cnt DESC;
+        """,
+        None,
+    ),
+    # 5) Most asked canonical questions: settled days come from the
+    #    triage_daily_canonicals rollup, the partial edges are read live.
+    (
+        "most_asked_canonicals",
+        """
+        WITH w AS (
+          SELECT
+            since,
+            timezone('UTC', since)::date + 1 AS first_day,
+            cutoff_day
+          FROM (SELECT %s::timestamptz AS since, %s::date AS cutoff_day) p
+        )
+        SELECT canonical, SUM(cnt)::bigint AS cnt
+        FROM (
+          SELECT r.canonical, r.cnt
+          FROM triage_daily_canonicals r, w
+          WHERE r.day >= w.first_day
+            AND r.day < w.cutoff_day
+          UNION ALL
+          SELECT sc.canonical, 1
+          FROM triage_session_canonicals sc, w
+          WHERE sc.created_at >= w.since
+            AND (sc.created_at < timezone('UTC', w.first_day::timestamp)
+                 OR sc.created_at >= timezone('UTC', w.cutoff_day::timestamp))
+        ) t
+        GROUP BY canonical
+        ORDER BY cnt DESC
+        LIMIT %s;
+        """,
+        30,
+    ),
+    # 6) Confidence distribution
+    (
+        "confidence_distribution",
+        """
+        SELECT
+          confidence_label_tr,
+          COUNT(*) AS cnt,
+          AVG(confidence_0_1) AS avg_conf,
+          COUNT(*) FILTER (WHERE confidence_0_1 IS NULL) AS null_conf_cnt
+        FROM triage_sessions
+        WHERE created_at >= %s
+          AND envelope_type = 'RESULT'
+        GROUP BY 1
+        ORDER BY cnt DESC;
+        """,
+        None,
+    ),
+]
+
+# 7) Low-confidence raw text samples. Streamed with binary COPY (which cannot
+#    run inside a pipeline) so the sample size can grow, e.g. for offline
+#    embedding, without row-protocol cost.
+SQL_RAW_TEXT_SAMPLES = """
+COPY (
+  SELECT id, created_at, input_text
+  FROM triage_sessions
+  WHERE created_at >= %s
+    AND envelope_type = 'RESULT'
+    AND (confidence_0_1 IS NULL OR confidence_0_1 < 0.45)
+  ORDER BY created_at DESC
+  LIMIT %s
+) TO STDOUT (FORMAT BINARY)
+"""
+RAW_TEXT_SAMPLE_COLUMNS: List[Tuple[str, str]] = [
+    ("session_id", "uuid"),
+    ("created_at", "timestamptz"),
+    ("input_text", "text"),
+]
+RAW_TEXT_SAMPLE_LIMIT = 50
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def connect(db_url: str) -> psycopg.Connection:
+    """Open a report connection; fail fast, keep idle links alive, and
+    prepare statements on first execute."""
+    return psycopg.connect(
+        db_url,
+        row_factory=dict_row,
+        prepare_threshold=0,
+        connect_timeout=10,
+        keepalives=1,
+        keepalives_idle=30,
+    )
+
+
+def fetchall_pipelined(
+    conn: psycopg.Connection, queries: List[Tuple[str, Tuple[Any, ...]]]
+) -> List[List[Dict[str, Any]]]:
+    """Run independent queries in one pipeline (single network round-trip).
+
+    Results are returned in the same order as ``queries``.
+    """
+    cursors = []
+    with conn.pipeline():
+        for sql, params in queries:
+            cur = conn.cursor(row_factory=dict_row)
+            cur.execute(sql, params)
+            cursors.append(cur)
+
+    results: List[List[Dict[str, Any]]] = []
+    for cur in cursors:
+        with cur:
+            results.append(cur.fetchall())
+    return results
+
+
+def copy_rows(
+    conn: psycopg.Connection,
+    sql: str,
+    params: Tuple[Any, ...],
+    columns: List[Tuple[str, str]],
+) -> List[Dict[str, Any]]:
+    """Read a binary COPY ... TO STDOUT into dicts keyed by ``columns`` names."""
+    names = [name for name, _ in columns]
+    with conn.cursor() as cur:
+        with cur.copy(sql, params) as copy:
+            copy.set_types([pg_type for _, pg_type in columns])
+            return [dict(zip(names, row)) for row in copy.rows()]
+
+
+def rollup_cutoff_day(now: datetime) -> date:
+    """First UTC day still read live: yesterday relative to ``now``."""
+    return now.astimezone(timezone.utc).date() - timedelta(days=1)
+
+
+def fill_daily_canonicals(
+    conn: psycopg.Connection, since: datetime, cutoff_day: date
+) -> bool:
+    """Fill settled rollup days for the window; False if the fill was skipped.
+
+    Skipped when TUNING_REPORT_READ_ONLY=1 or when the connection cannot
+    write (read-only role, hot standby).
+    """
+    if os.environ.get("TUNING_REPORT_READ_ONLY") == "1":
+        return False
+    try:
+        conn.execute(SQL_FILL_DAILY_CANONICALS, (since, cutoff_day))
+    except (pg_errors.ReadOnlySqlTransaction, pg_errors.InsufficientPrivilege):
+        conn.rollback()
+        return False
+    conn.commit()
+    return True
+
+
+def build_report(
+    conn: psycopg.Connection,
+    since: datetime,
+    *,
+    now: Optional[datetime] = None,
+    limits: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Run all report aggregates for the window starting at ``since``.
+
+    ``now`` is the run timestamp the rollup cutoff is derived from (defaults
+    to the current time). ``limits`` overrides the default LIMIT per report
+    key (e.g. ``{"down_examples": 50}``). Returns ``{report_key: rows}``.
+    """
+    limits = limits or {}
+    cutoff_day = rollup_cutoff_day(now or utc_now())
+    rollup_filled = fill_daily_canonicals(conn, since, cutoff_day)
+
+    queries = []
+    for key, sql, default_limit in SQL_STATEMENTS:
+        if key == "most_asked_canonicals":
+            if rollup_filled:
+                queries.append((sql, (since, cutoff_day, limits.get(key, default_limit))))
+                continue
+            sql = SQL_MOST_ASKED_CANONICALS_LIVE
+        if default_limit is None:
+            queries.append((sql, (since,)))
+        else:
+            queries.append((sql, (since, limits.get(key, default_limit))))
+    results = fetchall_pipelined(conn, queries)
+
+    report: Dict[str, Any] = {
+        key: rows for (key, _, _), rows in zip(SQL_STATEMENTS, results)
+    }
+    report["raw_text_samples"] = copy_rows(
+        conn,
+        SQL_RAW_TEXT_SAMPLES,
+        (since, limits.get("raw_text_samples", RAW_TEXT_SAMPLE_LIMIT)),
+        RAW_TEXT_SAMPLE_COLUMNS,
+    )
+    return report
+
+
+def default_serializer(obj: Any) -> Any:
+    # orjson serializes datetime and UUID natively; only Decimal needs help.
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def json_options() -> int:
+    """Compact JSON by default; TUNING_REPORT_PRETTY=1 indents for humans."""
+    return orjson.OPT_INDENT_2 if os.environ.get("TUNING_REPORT_PRETTY") == "1" else 0
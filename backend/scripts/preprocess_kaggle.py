@@ -17,12 +17,15 @@ Outputs to backend/app/data/kaggle_cache/:
 """
 
 import csv
-import json
-import re
+import hashlib
 import subprocess
 import sys
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
 # Paths
 SCRIPT_DIR = Path(__file__).resolve().parent
 BACKEND_DIR = SCRIPT_DIR.parent
@@ -30,13 +33,40 @@ RAW_DATA_DIR = BACKEND_DIR / "raw_data"
 DATA_DIR = BACKEND_DIR / "app" / "data"
 CACHE_DIR = DATA_DIR / "kaggle_cache"
 SYNONYMS_FILE = DATA_DIR / "synonyms_tr.json"
+GUARDRAILS_CONFIG = BACKEND_DIR.parent / "config" / "kaggle_mapping_guardrails.json"
+VALIDATOR_STAMP = BACKEND_DIR / "reports" / ".kaggle_mapping_validator_stamp"
+
+# Everything validate_kaggle_mapping.py reads; a change to any of them
+# invalidates the stamp of the last passing run.
+VALIDATOR_INPUTS = [
+    CACHE_DIR / "disease_symptoms.json",
+    CACHE_DIR / "kaggle_to_canonical.json",
+    SYNONYMS_FILE,
+    DATA_DIR / "symptom_question_bank_tr.json",
+    DATA_DIR / "specialty_keywords_tr.json",
+    GUARDRAILS_CONFIG,
+]
 
 # ─── Helpers ───
 
+# Whitespace -> "_" lookup table; runs of "_" are collapsed afterwards. Built
+# from str.isspace() so it covers exactly what the old [\s_]+ regex matched,
+# including non-ASCII spaces such as U+3000 and U+2028.
+_SEPARATORS = str.maketrans(
+    {c: "_" for c in map(chr, range(sys.maxunicode + 1)) if c.isspace()}
+)
+
+
+@lru_cache(maxsize=None)
 def normalize_symptom(s: str) -> str:
-    """Normalize a Kaggle symptom name: strip, lowercase, collapse spaces/underscores."""
-    s = s.strip().lower()
-    s = re.sub(r"[\s_]+", "_", s)
+    """Normalize a Kaggle symptom name: strip, lowercase, collapse spaces/underscores.
+
+    Memoized: dataset.csv repeats a few hundred distinct cells tens of thousands
+    of times, so each raw cell is normalized once and then served from cache.
+    """
+    s = s.strip().lower().translate(_SEPARATORS)
+    while "__" in s:
+        s = s.replace("__", "_")
     # Fix known Kaggle typos
     s = s.replace("dischromic _patches", "dischromic_patches")
     s = s.replace("spotting_ urination", "spotting_urination")
@@ -48,6 +78,11 @@ def human_readable(s: str) -> str:
     return s.replace("_", " ").strip()
 
 
+def _write_json(path: Path, obj) -> None:
+    """Write a cache file as UTF-8 JSON with 2-space indent and sorted keys."""
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
+
 # ─── Kaggle-to-canonical mapping ───
 
 # Manual mapping from Kaggle English symptom names to our Turkish canonicals
@@ -189,18 +224,18 @@ KAGGLE_TO_CANONICAL_MANUAL = {
 
 
 def build_kaggle_to_canonical() -> dict:
-    """Build the complete mapping, combining manual + synonym-based."""
-    mapping = {}
-    for kaggle_name, canonical in KAGGLE_TO_CANONICAL_MANUAL.items():
-        mapping[kaggle_name] = canonical
-    return mapping
+    """Build the complete mapping, combining manual + synonym-based.
+
+    Returns a fresh copy of the manual table; callers extend it in place.
+    """
+    return dict(KAGGLE_TO_CANONICAL_MANUAL)
 
 
 # ─── Main Processing ───
 
-def process_dataset_csv(path: Path) -> dict:
-    """Parse dataset.csv -> {disease: set(symptoms)}."""
-    diseases = {}
+def process_dataset_csv(path: Path) -> tuple[dict, set]:
+    """Parse dataset.csv -> ({disease: sorted symptoms}, all unique symptoms)."""
+    diseases = defaultdict(set)
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.reader(f)
         header = next(reader, None)  # skip header if present
@@ -208,20 +243,14 @@ def process_dataset_csv(path: Path) -> dict:
             if not row or not row[0].strip():
                 continue
             disease = row[0].strip()
-            symptoms = set()
-            for cell in row[1:]:
-                s = normalize_symptom(cell)
-                if s:
-                    symptoms.add(s)
-            if disease not in diseases:
-                diseases[disease] = set()
-            diseases[disease] |= symptoms
+            diseases[disease].update(s for s in map(normalize_symptom, row[1:]) if s)
+    all_symptoms = set().union(*diseases.values())
     # Convert sets to sorted lists
-    return {d: sorted(syms) for d, syms in sorted(diseases.items())}
+    return {d: sorted(syms) for d, syms in sorted(diseases.items())}, all_symptoms
 
 
 def process_severity_csv(path: Path) -> dict:
-    """Parse Symptom-severity.csv -> {symptom: weight}."""
+    """Parse Symptom-severity.csv -> {symptom: weight} (unordered; sorted on write)."""
     severity = {}
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.reader(f)
@@ -235,11 +264,11 @@ def process_severity_csv(path: Path) -> dict:
                     weight = 1
                 if symptom:
                     severity[symptom] = weight
-    return dict(sorted(severity.items()))
+    return severity
 
 
 def process_description_csv(path: Path) -> dict:
-    """Parse symptom_Description.csv -> {disease: description}."""
+    """Parse symptom_Description.csv -> {disease: description} (unordered; sorted on write)."""
     descriptions = {}
     with open(path, "r", encoding="utf-8") as f:
         reader = csv.reader(f)
@@ -247,7 +276,16 @@ def process_description_csv(path: Path) -> dict:
         for row in reader:
             if len(row) >= 2 and row[0].strip():
                 descriptions[row[0].strip()] = row[1].strip()
-    return dict(sorted(descriptions.items()))
+    return descriptions
+
+
+def _validator_inputs_digest(validator_path: Path) -> str:
+    """Content hash of the validator script and every file it reads."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in [validator_path, *VALIDATOR_INPUTS]:
+        h.update(path.name.encode("utf-8"))
+        h.update(path.read_bytes() if path.exists() else b"<missing>")
+    return h.hexdigest()
 
 
 def run_mapping_validator() -> int:
@@ -258,6 +296,12 @@ def run_mapping_validator() -> int:
         print("Run manually: python scripts/validate_kaggle_mapping.py")
         return 0
 
+    digest = _validator_inputs_digest(validator_path)
+    if VALIDATOR_STAMP.exists() and VALIDATOR_STAMP.read_text(encoding="utf-8").strip() == digest:
+        print("\nMapping guardrails: inputs unchanged since last passing run, skipping.")
+        print(f"Delete {VALIDATOR_STAMP} to force a re-run.")
+        return 0
+
     print("\nRunning mapping guardrails ...")
     result = subprocess.run(
         [sys.executable, str(validator_path)],
@@ -266,7 +310,11 @@ def run_mapping_validator() -> int:
     )
     if result.returncode != 0:
         print(f"ERROR: Mapping validator failed with exit code {result.returncode}.")
-    return int(result.returncode)
+        return int(result.returncode)
+
+    VALIDATOR_STAMP.parent.mkdir(parents=True, exist_ok=True)
+    VALIDATOR_STAMP.write_text(digest + "\n", encoding="utf-8")
+    return 0
 
 
 def main():
@@ -281,64 +329,55 @@ def main():
         print(f"ERROR: {dataset_csv} not found. Place Kaggle CSV files in {RAW_DATA_DIR}/")
         sys.exit(1)
 
+    # Cache payloads by file name; all of them are written together once
+    # every input has been parsed, so a failure mid-way leaves the old caches.
+    outputs = {}
+
     # 1) Process disease-symptom matrix
     print("Processing dataset.csv ...")
-    disease_symptoms = process_dataset_csv(dataset_csv)
-    out_path = CACHE_DIR / "disease_symptoms.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(disease_symptoms, f, ensure_ascii=False, indent=2)
-    print(f"  -> {out_path} ({len(disease_symptoms)} diseases)")
-
-    # Collect all unique symptoms
-    all_symptoms = set()
-    for syms in disease_symptoms.values():
-        all_symptoms.update(syms)
+    disease_symptoms, all_symptoms = process_dataset_csv(dataset_csv)
+    outputs["disease_symptoms.json"] = disease_symptoms
+    print(f"  -> {len(disease_symptoms)} diseases")
     print(f"  -> {len(all_symptoms)} unique symptoms")
 
     # 2) Process severity weights
     if severity_csv.exists():
         print("Processing Symptom-severity.csv ...")
         symptom_severity = process_severity_csv(severity_csv)
-        out_path = CACHE_DIR / "symptom_severity.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(symptom_severity, f, ensure_ascii=False, indent=2)
-        print(f"  -> {out_path} ({len(symptom_severity)} symptoms)")
+        print(f"  -> {len(symptom_severity)} symptoms")
     else:
         print(f"  WARNING: {severity_csv} not found, generating defaults")
-        symptom_severity = {s: 3 for s in sorted(all_symptoms)}
-        out_path = CACHE_DIR / "symptom_severity.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(symptom_severity, f, ensure_ascii=False, indent=2)
+        symptom_severity = {s: 3 for s in all_symptoms}
+    outputs["symptom_severity.json"] = symptom_severity
 
     # 3) Process descriptions
     if description_csv.exists():
         print("Processing symptom_Description.csv ...")
         descriptions = process_description_csv(description_csv)
-        out_path = CACHE_DIR / "disease_descriptions.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(descriptions, f, ensure_ascii=False, indent=2)
-        print(f"  -> {out_path} ({len(descriptions)} diseases)")
+        print(f"  -> {len(descriptions)} diseases")
     else:
         print(f"  WARNING: {description_csv} not found, generating empty")
-        out_path = CACHE_DIR / "disease_descriptions.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump({}, f, ensure_ascii=False, indent=2)
+        descriptions = {}
+    outputs["disease_descriptions.json"] = descriptions
 
     # 4) Build kaggle-to-canonical mapping
     print("Building kaggle_to_canonical.json ...")
     mapping = build_kaggle_to_canonical()
 
-    # Add any symptoms from dataset not in manual mapping
-    for sym in sorted(all_symptoms):
-        if sym not in mapping:
-            mapping[sym] = None  # unmapped
-
-    out_path = CACHE_DIR / "kaggle_to_canonical.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(dict(sorted(mapping.items())), f, ensure_ascii=False, indent=2)
+    # Add any symptoms from dataset not in manual mapping (unmapped -> None);
+    # key order is handled by _write_json.
+    mapping.update(dict.fromkeys(all_symptoms - mapping.keys()))
+    outputs["kaggle_to_canonical.json"] = mapping
 
     mapped_count = sum(1 for v in mapping.values() if v is not None)
-    print(f"  -> {out_path} ({mapped_count}/{len(mapping)} mapped to canonical)")
+    print(f"  -> {mapped_count}/{len(mapping)} mapped to canonical")
+
+    # 5) Write caches
+    print("Writing caches ...")
+    for name, obj in outputs.items():
+        out_path = CACHE_DIR / name
+        _write_json(out_path, obj)
+        print(f"  -> {out_path}")
 
     # Summary
     print(f"\nDone! {len(disease_symptoms)} diseases, {len(all_symptoms)} symptoms, "
@@ -9,21 +9,23 @@ For each canonical question, measures:
   - Composite effectiveness score
 
 Delta attribution uses the immediate next envelope after each ENVELOPE_QUESTION.
-Metrics come from payload._meta fields.
+Metrics come from payload._meta fields. Pairing and per-canonical aggregation
+run in Postgres (window functions); Python only computes the composite score.
 
 Usage:
   python scripts/question_effectiveness_report.py
 """
 
 from __future__ import annotations
-import json
 import os
-from collections import Counter, defaultdict
+import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+import orjson
 import psycopg
+from psycopg.rows import dict_row
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -36,119 +38,136 @@ def utc_now() -> datetime:
 def fetchall(
     conn: psycopg.Connection, sql: str, params: Tuple[Any, ...]
 ) -> List[Dict[str, Any]]:
-    with conn.cursor() as cur:
+    with conn.cursor(row_factory=dict_row) as cur:
         cur.execute(sql, params)
-        cols = [d.name for d in cur.description]  # type: ignore[union-attr]
-        rows = cur.fetchall()
-    return [dict(zip(cols, r)) for r in rows]
-
-
-def get_meta(payload: Any) -> Dict[str, Any]:
-    if isinstance(payload, dict):
-        m = payload.get("_meta")
-        if isinstance(m, dict):
-            return m
-    return {}
+        return cur.fetchall()
 
 
 def fnum(x: Any, default: float = 0.0) -> float:
+    # psycopg already returns float8 columns as float; NULL averages as None.
+    if x.__class__ is float:
+        return x
+    if x is None:
+        return default
     try:
         return float(x)
     except Exception:
         return default
 
 
+# Numeric _meta fields may arrive as JSON numbers or numeric strings; anything
+# else counts as 0, mirroring fnum() on the Python side. Digit and exponent
+# counts are bounded so every match fits float8: an out-of-range value like
+# 1e999 must fall through to 0, not abort the whole query in the cast.
+_META_NUM = r"^\s*[-+]?(\d{1,15}(\.\d{0,15})?|\.\d{1,15})([eE][-+]?\d{1,2})?\s*$"
+
+# Every character str.strip() removes (str.isspace(), including U+001C-U+001F,
+# U+0085, U+00A0 and the Unicode spaces), as a Postgres escape string, so
+# btrim() groups canonicals and answers exactly like the Python side did.
+# \uXXXX escapes need a UTF8 server encoding, which Supabase always uses.
+_STRIP_CHARS = "E'%s'" % "".join(
+    f"\\u{i:04x}" for i in range(sys.maxunicode + 1) if chr(i).isspace()
+)
+
+# Pairs each ENVELOPE_QUESTION with the next envelope of the same session and
+# aggregates per canonical server-side, so only one row per canonical crosses
+# the wire. A question followed by another question is superseded and gets no
+# delta; questions without a canonical are ignored entirely.
+EFFECTIVENESS_SQL = f"""
+    WITH ev AS (
+      SELECT
+        id,
+        session_id,
+        created_at,
+        event_type,
+        lower(btrim(payload->>'canonical', {_STRIP_CHARS})) AS canonical,
+        lower(btrim(payload->>'value', {_STRIP_CHARS})) AS answer,
+        CASE WHEN payload->'_meta'->>'specialty_gap' ~ '{_META_NUM}'
+             THEN (payload->'_meta'->>'specialty_gap')::float8 ELSE 0 END AS gap,
+        CASE WHEN payload->'_meta'->>'confidence_0_1' ~ '{_META_NUM}'
+             THEN (payload->'_meta'->>'confidence_0_1')::float8 ELSE 0 END AS conf
+      FROM triage_events
+      WHERE created_at >= %s
+        AND event_type IN (
+          'ENVELOPE_QUESTION', 'ANSWER_RECEIVED', 'ENVELOPE_RESULT', 'ENVELOPE_EMERGENCY'
+        )
+    ),
+    envelopes AS (
+      SELECT
+        event_type,
+        canonical,
+        LEAD(event_type) OVER w AS next_type,
+        LEAD(gap) OVER w - gap AS gap_delta,
+        LEAD(conf) OVER w - conf AS conf_delta
+      FROM ev
+      WHERE event_type IN ('ENVELOPE_RESULT', 'ENVELOPE_EMERGENCY')
+         OR (event_type = 'ENVELOPE_QUESTION' AND canonical <> '')
+      WINDOW w AS (PARTITION BY session_id ORDER BY created_at, id)
+    ),
+    asked AS (
+      SELECT
+        canonical,
+        COUNT(*) AS asked_count,
+        COUNT(*) FILTER (WHERE next_type IN ('ENVELOPE_RESULT', 'ENVELOPE_EMERGENCY')) AS delta_samples,
+        AVG(gap_delta) FILTER (WHERE next_type IN ('ENVELOPE_RESULT', 'ENVELOPE_EMERGENCY')) AS avg_gap_delta,
+        AVG(conf_delta) FILTER (WHERE next_type IN ('ENVELOPE_RESULT', 'ENVELOPE_EMERGENCY')) AS avg_conf_delta,
+        COUNT(*) FILTER (WHERE next_type = 'ENVELOPE_RESULT') AS result_after_question
+      FROM envelopes
+      WHERE event_type = 'ENVELOPE_QUESTION'
+      GROUP BY canonical
+    ),
+    answers AS (
+      SELECT
+        canonical,
+        COUNT(*) AS answers_total,
+        COUNT(*) FILTER (WHERE answer = 'yes') AS yes,
+        COUNT(*) FILTER (WHERE answer = 'no') AS no
+      FROM ev
+      WHERE event_type = 'ANSWER_RECEIVED'
+        AND canonical <> ''
+        AND answer <> ''
+      GROUP BY canonical
+    )
+    SELECT
+      a.canonical,
+      a.asked_count,
+      COALESCE(b.answers_total, 0) AS answers_total,
+      COALESCE(b.yes, 0) AS yes,
+      COALESCE(b.no, 0) AS no,
+      a.delta_samples,
+      a.avg_gap_delta,
+      a.avg_conf_delta,
+      a.result_after_question
+    FROM asked a
+    LEFT JOIN answers b ON b.canonical = a.canonical
+    ORDER BY a.canonical;
+"""
+
+
 def main(days: int = 14) -> None:
     db_url = os.environ["SUPABASE_DB_URL"]
     since = utc_now() - timedelta(days=days)
 
     with psycopg.connect(db_url) as conn:
-        events = fetchall(conn, """
-            SELECT session_id::text, created_at, event_type, payload
-            FROM triage_events
-            WHERE created_at >= %s
-            ORDER BY session_id, created_at;
-        """, (since,))
-
-    # Per canonical aggregates
-    asked_cnt: Counter = Counter()
-    answer_cnt: Dict[str, Counter] = defaultdict(Counter)
-
-    # Delta aggregates
-    gap_delta_sum: Dict[str, float] = defaultdict(float)
-    conf_delta_sum: Dict[str, float] = defaultdict(float)
-    delta_n: Counter = Counter()
-
-    # Stop rate
-    result_after_q: Counter = Counter()
-
-    # Track last question baseline per session
-    last_q: Dict[str, Dict[str, Any]] = {}
-
-    for e in events:
-        sid = e["session_id"]
-        et = e["event_type"]
-        payload = e["payload"] or {}
-
-        if et == "ENVELOPE_QUESTION":
-            meta = get_meta(payload)
-            canonical = (payload.get("canonical") or "").strip().lower()
-            if not canonical:
-                continue
-
-            asked_cnt[canonical] += 1
-            last_q[sid] = {
-                "canonical": canonical,
-                "gap": fnum(meta.get("specialty_gap"), 0.0),
-                "conf": fnum(meta.get("confidence_0_1"), 0.0),
-            }
-
-        elif et == "ANSWER_RECEIVED":
-            c = (payload.get("canonical") or "").strip().lower()
-            v = (payload.get("value") or "").strip().lower()
-            if c and v:
-                answer_cnt[c][v] += 1
-
-        elif et in ("ENVELOPE_RESULT", "ENVELOPE_EMERGENCY"):
-            # Attribute delta to last asked question
-            if sid not in last_q:
-                continue
-
-            base = last_q[sid]
-            base_c = base["canonical"]
-            meta = get_meta(payload)
-
-            cur_gap = fnum(meta.get("specialty_gap"), 0.0)
-            cur_conf = fnum(meta.get("confidence_0_1"), 0.0)
-
-            gap_delta_sum[base_c] += cur_gap - base["gap"]
-            conf_delta_sum[base_c] += cur_conf - base["conf"]
-            delta_n[base_c] += 1
-
-            if et == "ENVELOPE_RESULT":
-                result_after_q[base_c] += 1
-
-            del last_q[sid]
-
-    # Also handle when next envelope is another QUESTION (delta between questions)
-    # Re-scan: for sessions still in last_q, they didn't reach RESULT after their last Q
-    # That's fine — we just don't count deltas for those
+        stats = fetchall(conn, EFFECTIVENESS_SQL, (since,))
 
     # Build rows
     rows: List[Dict[str, Any]] = []
-    for q, cnt in asked_cnt.items():
-        yes = answer_cnt[q].get("yes", 0)
-        no = answer_cnt[q].get("no", 0)
-        total_ans = sum(answer_cnt[q].values()) or 0
+    for r in stats:
+        q = r["canonical"]
+        cnt = r["asked_count"]
+        yes = r["yes"]
+        no = r["no"]
+        total_ans = r["answers_total"]
 
         p_yes = (yes / total_ans) if total_ans else 0.0
         balance = 1.0 - abs(p_yes - 0.5) * 2.0
 
-        n = delta_n.get(q, 0)
-        avg_gap_delta = (gap_delta_sum[q] / n) if n else 0.0
-        avg_conf_delta = (conf_delta_sum[q] / n) if n else 0.0
+        n = r["delta_samples"]
+        avg_gap_delta = fnum(r["avg_gap_delta"], 0.0)
+        avg_conf_delta = fnum(r["avg_conf_delta"], 0.0)
 
-        stop_rate = (result_after_q[q] / cnt) if cnt else 0.0
+        stop_rate = (r["result_after_question"] / cnt) if cnt else 0.0
 
         # Composite effectiveness
         eff = (
@@ -170,7 +189,7 @@ def main(days: int = 14) -> None:
             "delta_samples": int(n),
             "avg_specialty_gap_delta": round(avg_gap_delta, 4),
             "avg_confidence_delta": round(avg_conf_delta, 4),
-            "result_after_question": int(result_after_q[q]),
+            "result_after_question": int(r["result_after_question"]),
             "stop_rate_0_1": round(stop_rate, 3),
             "effectiveness_0_1": round(eff, 3),
         })
@@ -189,7 +208,7 @@ def main(days: int = 14) -> None:
 
     Path("reports").mkdir(parents=True, exist_ok=True)
     path = Path("reports") / f"question_effectiveness_{utc_now().strftime('%Y%m%d_%H%M%S')}.json"
-    path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_bytes(orjson.dumps(out, option=orjson.OPT_INDENT_2))
     print(f"OK -> {path}")
 
 
@@ -7,9 +7,10 @@ Usage:
 
 import sys
 import os
-import json
 from pathlib import Path
 
+import orjson
+
 
 def load_deployment_bundle(deployment_id: str):
     """Load deployment bundle for rollback."""
@@ -25,20 +26,24 @@ def load_deployment_bundle(deployment_id: str):
     else:
         bundle_path = bundle_files[0]
     
-    with open(bundle_path) as f:
-        return json.load(f)
+    return orjson.loads(bundle_path.read_bytes())
 
 
 def revert_files(bundle: dict, config_dir: Path):
     """Revert config files to pre-deployment state."""
     files = bundle.get("files", {})
     
-    for filename, original_content in files.items():
+    # Serialize everything first so a bad entry aborts before any file is touched.
+    blobs = {
+        filename: orjson.dumps(original_content, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        for filename, original_content in files.items()
+    }
+
+    for filename, blob in blobs.items():
         file_path = config_dir / filename
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(original_content, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        tmp_path.write_bytes(blob)
+        os.replace(tmp_path, file_path)
         
         print(f"✓ Reverted: {filename}")
 
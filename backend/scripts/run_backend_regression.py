@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 
@@ -14,14 +15,20 @@ class Step:
     command: list[str]
 
 
+# Steps are independent of each other and run concurrently; their output is
+# buffered and printed in declaration order so CI logs stay readable.
 STEPS = [
     Step(
         name="golden_flow_regression",
-        command=[sys.executable, "-m", "unittest", "tests.test_golden_flows", "-v"],
+        command=[sys.executable, "-m", "unittest", "tests.unit.test_golden_flows", "-v"],
     ),
     Step(
-        name="backend_test_suite",
-        command=[sys.executable, "-m", "unittest", "discover", "-s", "tests", "-p", "test_*.py", "-q"],
+        name="backend_unit_tests",
+        command=[sys.executable, "-m", "unittest", "discover", "-s", "tests/unit", "-p", "test_*.py", "-q"],
+    ),
+    Step(
+        name="backend_http_tests",
+        command=[sys.executable, "-m", "unittest", "discover", "-s", "tests/api", "-p", "test_*.py", "-q"],
     ),
     Step(
         name="kaggle_mapping_guardrails",
@@ -30,19 +37,37 @@ STEPS = [
 ]
 
 
-def main() -> int:
-    completed = 0
+def run_step(step: Step) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(step.command, check=False, capture_output=True, text=True)
+
 
+def main() -> int:
     for step in STEPS:
         print(f"[run_backend_regression] START {step.name}: {' '.join(step.command)}", flush=True)
-        result = subprocess.run(step.command, check=False)
+
+    with ThreadPoolExecutor(max_workers=len(STEPS)) as pool:
+        results = list(pool.map(run_step, STEPS))
+
+    completed = 0
+    failed: tuple[Step, subprocess.CompletedProcess[str]] | None = None
+    for step, result in zip(STEPS, results):
+        print(f"[run_backend_regression] END {step.name}: exit={result.returncode}", flush=True)
+        sys.stdout.write(result.stdout)
+        sys.stdout.flush()
+        sys.stderr.write(result.stderr)
+        sys.stderr.flush()
         if result.returncode != 0:
-            print(
-                f"BACKEND_REGRESSION_SUMMARY status=FAIL failed_step={step.name} completed={completed}/{len(STEPS)}",
-                flush=True,
-            )
-            return result.returncode
-        completed += 1
+            failed = failed or (step, result)
+        else:
+            completed += 1
+
+    if failed is not None:
+        step, result = failed
+        print(
+            f"BACKEND_REGRESSION_SUMMARY status=FAIL failed_step={step.name} completed={completed}/{len(STEPS)}",
+            flush=True,
+        )
+        return result.returncode
 
     print(f"BACKEND_REGRESSION_SUMMARY status=PASS completed={completed}/{len(STEPS)}", flush=True)
     return 0
@@ -3,60 +3,72 @@
 
 Usage:
     python scripts/update_deployment_status.py --deployment-id ID --status STATUS
+    python scripts/update_deployment_status.py --deployment-id ID1,ID2 --status STATUS
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
+from typing import List
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+VALID_STATUSES = ["applied", "rolled_back_pending", "rolled_back"]
+
+
+def update_status(deployment_ids: List[str], status: str):
+    """Update deployment status for one or more deployments in a single request.
+
+    Nothing is updated unless every ID exists.
+    """
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Invalid status: {status}")
+    deployment_ids = list(dict.fromkeys(d.strip() for d in deployment_ids if d.strip()))
+    if not deployment_ids:
+        raise ValueError("Missing deployment ID")
 
-def update_status(deployment_id: str, status: str):
-    """Update deployment status."""
     from supabase import create_client
-    
+
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    
+
     if not url or not key:
         raise ValueError("Missing Supabase credentials")
-    
+
     sb = create_client(url, key)
-    
-    valid_statuses = ["applied", "rolled_back_pending", "rolled_back"]
-    if status not in valid_statuses:
-        raise ValueError(f"Invalid status: {status}")
-    
-    res = sb.table("tuning_deployments").update({"status": status}).eq("id", deployment_id).execute()
-    
-    if not res.data:
-        raise ValueError(f"Deployment not found: {deployment_id}")
-    
-    print(f"✓ Updated deployment {deployment_id} → {status}")
+
+    table = sb.table("tuning_deployments")
+    found = table.select("id").in_("id", deployment_ids).execute()
+    # Compare case-insensitively: a uuid column returns the lowercase form.
+    existing = {str(row.get("id")).lower() for row in found.data or []}
+    missing = [d for d in deployment_ids if d.lower() not in existing]
+    if missing:
+        raise ValueError(f"Deployment not found: {', '.join(missing)} (nothing updated)")
+
+    table.update({"status": status}).in_("id", deployment_ids).execute()
+
+    for deployment_id in deployment_ids:
+        print(f"✓ Updated deployment {deployment_id} → {status}")
 
 
 def main():
-    if "--deployment-id" not in sys.argv or "--status" not in sys.argv:
-        print("Usage: update_deployment_status.py --deployment-id ID --status STATUS")
-        return 1
-    
-    idx_id = sys.argv.index("--deployment-id")
-    idx_status = sys.argv.index("--status")
-    
-    deployment_id = sys.argv[idx_id + 1] if idx_id + 1 < len(sys.argv) else None
-    status = sys.argv[idx_status + 1] if idx_status + 1 < len(sys.argv) else None
-    
-    if not deployment_id or not status:
+    ap = argparse.ArgumentParser(description="Update deployment status in database")
+    ap.add_argument("--deployment-id", required=True, help="Deployment ID (comma-separated for a batch)")
+    ap.add_argument("--status", required=True, choices=VALID_STATUSES)
+    args = ap.parse_args()
+
+    deployment_ids = [d.strip() for d in args.deployment_id.split(",") if d.strip()]
+    if not deployment_ids:
         print("Error: Missing arguments")
         return 1
-    
+
     try:
-        update_status(deployment_id, status)
+        update_status(deployment_ids, args.status)
     except Exception as e:
         print(f"Error: {e}")
         return 1
-    
+
     return 0
 
 
@@ -4,12 +4,16 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import orjson
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -18,87 +22,106 @@ DEFAULT_DATA_DIR = BACKEND_DIR / "app" / "data"
 DEFAULT_CONFIG_PATH = BACKEND_DIR.parent / "config" / "kaggle_mapping_guardrails.json"
 DEFAULT_REPORTS_DIR = BACKEND_DIR / "reports"
 
+# Validation inputs, relative to the data dir. The keys double as the
+# ``preloaded`` keys accepted by run_validation.
+INPUT_FILES: Dict[str, Path] = {
+    "disease_symptoms": Path("kaggle_cache") / "disease_symptoms.json",
+    "kaggle_to_canonical": Path("kaggle_cache") / "kaggle_to_canonical.json",
+    "synonyms": Path("synonyms_tr.json"),
+    "question_bank": Path("symptom_question_bank_tr.json"),
+    "specialty_keywords": Path("specialty_keywords_tr.json"),
+}
+
 
-DEFAULT_GUARDRAILS: Dict[str, Any] = {
-    "null_allowlist": [],
-    "coverage": {
+# Read-only so the defaults can be shared by reference instead of copied.
+DEFAULT_GUARDRAILS: Mapping[str, Any] = MappingProxyType({
+    "null_allowlist": (),
+    "coverage": MappingProxyType({
         "min_total_symptoms": 3,
         "min_non_null_ratio_critical": 0.6,
-    },
-    "canonical_reachability": {
-        "require_any_source": ["synonyms", "question_bank", "specialty_keywords"],
-    },
-    "collapse": {
+    }),
+    "canonical_reachability": MappingProxyType({
+        "require_any_source": ("synonyms", "question_bank", "specialty_keywords"),
+    }),
+    "collapse": MappingProxyType({
         "max_en_symptoms_per_canonical_warning": 4,
         "min_non_null_symptoms_for_disease_check": 3,
         "max_single_canonical_share_warning": 0.75,
-    },
-}
+    }),
+})
+
+
+@lru_cache(maxsize=32)
+def _load_json_cached(path_str: str, mtime_ns: int, size: int) -> Any:
+    return orjson.loads(Path(path_str).read_bytes())
 
 
 def _load_json(path: Path) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # Keyed by mtime/size so repeated runs in one process skip re-parsing
+    # unchanged files. Callers treat the result as read-only.
+    st = path.stat()
+    return _load_json_cached(str(path), st.st_mtime_ns, st.st_size)
+
 
+def _write_report(path: Path, report: Dict[str, Any]) -> None:
+    path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
 
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+
+@lru_cache(maxsize=65536)
+def _normalize_str(value: str) -> str:
+    return value.strip().lower()
 
 
 def _normalize(value: Any) -> str:
     if not isinstance(value, str):
         return ""
-    return value.strip().lower()
+    # Symptom and canonical strings repeat across every pass; memoize them.
+    return _normalize_str(value)
 
 
-def _merge_dict(defaults: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-    merged = dict(defaults)
-    for key, value in override.items():
-        if (
-            key in merged
-            and isinstance(merged[key], dict)
-            and isinstance(value, dict)
-        ):
-            merged[key] = _merge_dict(merged[key], value)
-        else:
-            merged[key] = value
-    return merged
+def _as_str(value: Any) -> str:
+    return value if isinstance(value, str) else ""
 
 
-def _load_guardrails(path: Path) -> Dict[str, Any]:
+def _load_guardrails(path: Path) -> Mapping[str, Any]:
     if not path.exists():
         return DEFAULT_GUARDRAILS
-    cfg = _load_json(path)
-    if not isinstance(cfg, dict):
+    return _merge_guardrails(_load_json(path))
+
+
+def _merge_guardrails(cfg: Any) -> Mapping[str, Any]:
+    if not isinstance(cfg, dict) or not cfg:
         return DEFAULT_GUARDRAILS
-    return _merge_dict(DEFAULT_GUARDRAILS, cfg)
+    # The guardrail schema is one level deep: overlay each known section
+    # instead of walking both dicts recursively.
+    merged = {**DEFAULT_GUARDRAILS, **cfg}
+    for key, defaults in DEFAULT_GUARDRAILS.items():
+        override = cfg.get(key)
+        if isinstance(defaults, Mapping) and isinstance(override, dict):
+            merged[key] = {**defaults, **override}
+    return merged
 
 
 def _collect_dataset_symptoms(disease_symptoms: Dict[str, List[str]]) -> Set[str]:
     symptoms: Set[str] = set()
     for disease_syms in disease_symptoms.values():
-        for symptom in disease_syms:
-            symptom_key = _normalize(symptom)
-            if symptom_key:
-                symptoms.add(symptom_key)
+        symptoms.update(filter(None, map(_normalize, disease_syms)))
     return symptoms
 
 
 def _collect_synonym_canonicals(synonyms_json: Dict[str, Any]) -> Set[str]:
     out: Set[str] = set()
-    for row in synonyms_json.get("synonyms", []):
-        canonical = _normalize(row.get("canonical"))
-        if canonical:
-            out.add(canonical)
+    out.update(filter(None, (
+        _normalize(row.get("canonical")) for row in synonyms_json.get("synonyms", [])
+    )))
     return out
 
 
 def _collect_question_canonicals(question_bank: Dict[str, Any]) -> Set[str]:
     out: Set[str] = set()
-    for row in question_bank.get("questions", []):
-        canonical = _normalize(row.get("canonical_symptom"))
-        if canonical:
-            out.add(canonical)
+    out.update(filter(None, (
+        _normalize(row.get("canonical_symptom")) for row in question_bank.get("questions", [])
+    )))
     return out
 
 
@@ -106,17 +129,10 @@ def _collect_specialty_terms(specialty_keywords: Dict[str, Any]) -> Set[str]:
     out: Set[str] = set()
     for specialty in specialty_keywords.get("specialties", []):
         for key in ("keywords_tr", "negative_keywords_tr"):
-            for term in specialty.get(key, []):
-                normalized = _normalize(term)
-                if normalized:
-                    out.add(normalized)
+            out.update(filter(None, map(_normalize, specialty.get(key, []))))
     return out
 
 
-def _is_non_null_mapping(value: Any) -> bool:
-    return isinstance(value, str) and bool(_normalize(value))
-
-
 def _summarize_issue(check: str, message: str, details: Optional[Any] = None) -> Dict[str, Any]:
     payload: Dict[str, Any] = {"check": check, "message": message}
     if details is not None:
@@ -128,24 +144,29 @@ def run_validation(
     data_dir: Path,
     guardrails_config_path: Path,
     reports_dir: Path,
+    trust_normalized: bool = False,
+    out_path: Optional[Path] = None,
+    preloaded: Optional[Dict[str, Any]] = None,
 ) -> Tuple[Dict[str, Any], int, Path]:
-    disease_symptoms_path = data_dir / "kaggle_cache" / "disease_symptoms.json"
-    mapping_path = data_dir / "kaggle_cache" / "kaggle_to_canonical.json"
-    synonyms_path = data_dir / "synonyms_tr.json"
-    question_bank_path = data_dir / "symptom_question_bank_tr.json"
-    specialty_keywords_path = data_dir / "specialty_keywords_tr.json"
-
-    required_paths = [
-        disease_symptoms_path,
-        mapping_path,
-        synonyms_path,
-        question_bank_path,
-        specialty_keywords_path,
-    ]
-    missing_paths = [str(path) for path in required_paths if not path.exists()]
+    # preloaded supplies already-parsed inputs keyed like INPUT_FILES, plus an
+    # optional raw "guardrails" config; data_dir and the config path are then
+    # not read.
+    now = datetime.now(timezone.utc)
+    generated_at = now.isoformat()
+    # An explicit out_path (--json-out) replaces the timestamped report file.
+    if out_path is None:
+        out_path = reports_dir / f"kaggle_mapping_validation_{now.strftime('%Y%m%d_%H%M%S')}.json"
+
+    if preloaded is not None:
+        guardrails = _merge_guardrails(preloaded.get("guardrails"))
+        inputs = preloaded
+        missing_paths = []
+    else:
+        input_paths = {name: data_dir / rel for name, rel in INPUT_FILES.items()}
+        missing_paths = [str(path) for path in input_paths.values() if not path.exists()]
     if missing_paths:
         report = {
-            "generated_at": _now_iso(),
+            "generated_at": generated_at,
             "status": "fail",
             "summary": {
                 "critical_count": 1,
@@ -160,43 +181,61 @@ def run_validation(
             ],
             "warnings": [],
         }
-        reports_dir.mkdir(parents=True, exist_ok=True)
-        out_path = reports_dir / f"kaggle_mapping_validation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_report(out_path, report)
         return report, 2, out_path
 
-    guardrails = _load_guardrails(guardrails_config_path)
+    if preloaded is None:
+        guardrails = _load_guardrails(guardrails_config_path)
+        inputs = {name: _load_json(path) for name, path in input_paths.items()}
+
+    disease_symptoms_raw = inputs["disease_symptoms"]
+    mapping_raw = inputs["kaggle_to_canonical"]
+    synonyms_json = inputs["synonyms"]
+    question_bank_json = inputs["question_bank"]
+    specialty_keywords_json = inputs["specialty_keywords"]
 
-    disease_symptoms_raw = _load_json(disease_symptoms_path)
-    mapping_raw = _load_json(mapping_path)
-    synonyms_json = _load_json(synonyms_path)
-    question_bank_json = _load_json(question_bank_path)
-    specialty_keywords_json = _load_json(specialty_keywords_path)
+    # The Kaggle exports are generated already lowercased/trimmed; with
+    # trust_normalized their strings are used as-is.
+    normalize_input = _as_str if trust_normalized else _normalize
 
-    disease_symptoms: Dict[str, List[str]] = {}
-    for disease, syms in disease_symptoms_raw.items():
-        normalized = [_normalize(symptom) for symptom in syms]
-        disease_symptoms[disease] = [symptom for symptom in normalized if symptom]
+    disease_symptoms: Dict[str, List[str]] = {
+        disease: [symptom for symptom in map(normalize_input, syms) if symptom]
+        for disease, syms in disease_symptoms_raw.items()
+    }
 
     mapping: Dict[str, Any] = {}
     for symptom_key, canonical in mapping_raw.items():
-        key = _normalize(symptom_key)
+        key = normalize_input(symptom_key)
         if not key:
             continue
         mapping[key] = canonical
 
+    # One pass over the mapping derives everything the checks need:
+    # normalized canonical per key (None for null/blank/non-string), the
+    # null keys and the canonical -> EN symptom reverse index.
+    mapping_norm: Dict[str, Optional[str]] = {}
+    null_map_keys: List[str] = []
+    canonical_to_en: Dict[str, List[str]] = defaultdict(list)
+    for key, canonical in mapping.items():
+        if canonical is None:
+            null_map_keys.append(key)
+            mapping_norm[key] = None
+            continue
+        canonical_norm = normalize_input(canonical) or None
+        mapping_norm[key] = canonical_norm
+        if canonical_norm is not None:
+            canonical_to_en[canonical_norm].append(key)
+    null_map_keys.sort()
+
     dataset_symptom_keys = _collect_dataset_symptoms(disease_symptoms)
-    mapping_keys = set(mapping.keys())
+    mapping_keys = mapping.keys()
     missing_map_keys = sorted(dataset_symptom_keys - mapping_keys)
 
     null_allowlist = {
         _normalize(item) for item in guardrails.get("null_allowlist", [])
         if _normalize(item)
     }
-    null_map_keys = sorted(
-        key for key, value in mapping.items()
-        if value is None
-    )
     unexpected_null_keys = sorted(set(null_map_keys) - null_allowlist)
 
     coverage_cfg = guardrails.get("coverage", {})
@@ -205,6 +244,8 @@ def run_validation(
 
     per_disease_coverage: List[Dict[str, Any]] = []
     low_coverage_diseases: List[Dict[str, Any]] = []
+    # One tally per disease, reused by the coverage and collapse checks.
+    disease_canonical_counts: Dict[str, Tuple[Counter, int]] = {}
     mapped_non_null_total = 0
     mapped_total = 0
     dataset_total = 0
@@ -213,12 +254,11 @@ def run_validation(
         total = len(symptoms)
         if total == 0:
             continue
+        counts = Counter(c for c in map(mapping_norm.get, symptoms) if c)
+        mapped_non_null = sum(counts.values())
+        disease_canonical_counts[disease] = (counts, mapped_non_null)
         dataset_total += total
         mapped_total += sum(1 for symptom in symptoms if symptom in mapping)
-        mapped_non_null = sum(
-            1 for symptom in symptoms
-            if _is_non_null_mapping(mapping.get(symptom))
-        )
         mapped_non_null_total += mapped_non_null
         ratio = mapped_non_null / total
         row = {
@@ -231,33 +271,29 @@ def run_validation(
         if total >= min_total_for_coverage and ratio < min_non_null_ratio_critical:
             low_coverage_diseases.append(row)
 
-    canonical_from_mapping = sorted({
-        _normalize(value)
-        for value in mapping.values()
-        if _is_non_null_mapping(value)
-    })
+    per_disease_coverage.sort(key=itemgetter("coverage_ratio"))
+
+    canonical_from_mapping = sorted(canonical_to_en)
 
     synonyms_canonicals = _collect_synonym_canonicals(synonyms_json)
     question_canonicals = _collect_question_canonicals(question_bank_json)
     specialty_terms = _collect_specialty_terms(specialty_keywords_json)
 
-    unreachable_canonicals: List[str] = []
-    reachability_rows: List[Dict[str, Any]] = []
-    for canonical in canonical_from_mapping:
-        in_sources = []
-        if canonical in synonyms_canonicals:
-            in_sources.append("synonyms")
-        if canonical in question_canonicals:
-            in_sources.append("question_bank")
-        if canonical in specialty_terms:
-            in_sources.append("specialty_keywords")
-
-        reachability_rows.append({
+    canonical_sources: List[Tuple[str, Set[str]]] = [
+        ("synonyms", synonyms_canonicals),
+        ("question_bank", question_canonicals),
+        ("specialty_keywords", specialty_terms),
+    ]
+    unreachable_canonicals: List[str] = sorted(
+        set(canonical_from_mapping).difference(*(terms for _, terms in canonical_sources))
+    )
+    reachability_rows: List[Dict[str, Any]] = [
+        {
             "canonical": canonical,
-            "sources": in_sources,
-        })
-        if not in_sources:
-            unreachable_canonicals.append(canonical)
+            "sources": [name for name, terms in canonical_sources if canonical in terms],
+        }
+        for canonical in canonical_from_mapping
+    ]
 
     collapse_cfg = guardrails.get("collapse", {})
     max_en_per_canonical_warning = int(
@@ -270,12 +306,6 @@ def run_validation(
         collapse_cfg.get("max_single_canonical_share_warning", 0.75)
     )
 
-    canonical_to_en: Dict[str, List[str]] = defaultdict(list)
-    for symptom_key, canonical in mapping.items():
-        canonical_norm = _normalize(canonical)
-        if canonical_norm:
-            canonical_to_en[canonical_norm].append(symptom_key)
-
     global_collapse_hotspots: List[Dict[str, Any]] = []
     for canonical, en_list in sorted(canonical_to_en.items()):
         if len(en_list) > max_en_per_canonical_warning:
@@ -286,18 +316,11 @@ def run_validation(
             })
 
     disease_collapse_warnings: List[Dict[str, Any]] = []
-    for disease, symptoms in disease_symptoms.items():
-        mapped_canonicals = [
-            _normalize(mapping.get(symptom))
-            for symptom in symptoms
-            if _is_non_null_mapping(mapping.get(symptom))
-        ]
-        mapped_canonicals = [c for c in mapped_canonicals if c]
-        non_null_total = len(mapped_canonicals)
+    for disease, (counts, non_null_total) in disease_canonical_counts.items():
         if non_null_total < min_non_null_for_disease_collapse:
             continue
-        counts = Counter(mapped_canonicals)
-        top_canonical, top_count = counts.most_common(1)[0]
+        # First-seen canonical wins ties, same as most_common(1).
+        top_canonical, top_count = max(counts.items(), key=itemgetter(1))
         share = top_count / non_null_total
         if share > max_single_canonical_share_warning:
             disease_collapse_warnings.append({
@@ -305,6 +328,7 @@ def run_validation(
                 "mapped_non_null": non_null_total,
                 "top_canonical": top_canonical,
                 "top_canonical_share": round(share, 4),
+                # Only materialized for the few diseases that warn.
                 "distribution": dict(counts),
             })
 
@@ -380,7 +404,7 @@ def run_validation(
     overall_map_presence_ratio = (mapped_total / dataset_total) if dataset_total else 1.0
 
     report: Dict[str, Any] = {
-        "generated_at": _now_iso(),
+        "generated_at": generated_at,
         "status": "fail" if critical_violations else "pass",
         "inputs": {
             "data_dir": str(data_dir),
@@ -408,10 +432,7 @@ def run_validation(
             },
             "disease_coverage": {
                 "threshold_ratio": min_non_null_ratio_critical,
-                "rows": sorted(
-                    per_disease_coverage,
-                    key=lambda row: row["coverage_ratio"],
-                ),
+                "rows": per_disease_coverage,
                 "low_coverage": low_coverage_diseases,
             },
             "canonical_reachability": {
@@ -432,9 +453,8 @@ def run_validation(
         "warnings": warnings,
     }
 
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    out_path = reports_dir / f"kaggle_mapping_validation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_report(out_path, report)
 
     exit_code = 2 if critical_violations else 0
     return report, exit_code, out_path
@@ -487,26 +507,24 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         default=None,
         help="Optional explicit JSON report output path.",
     )
+    parser.add_argument(
+        "--trust-normalized",
+        action="store_true",
+        help="Skip strip/lower on Kaggle cache strings (inputs already normalized).",
+    )
     return parser.parse_args(list(argv) if argv is not None else None)
 
 
 def main(argv: Optional[Iterable[str]] = None) -> int:
     args = parse_args(argv)
-    report, exit_code, default_report_path = run_validation(
+    report, exit_code, report_path = run_validation(
         data_dir=Path(args.data_dir),
         guardrails_config_path=Path(args.config),
         reports_dir=Path(args.reports_dir),
+        trust_normalized=args.trust_normalized,
+        out_path=Path(args.json_out) if args.json_out else None,
     )
 
-    report_path = default_report_path
-    if args.json_out:
-        report_path = Path(args.json_out)
-        report_path.parent.mkdir(parents=True, exist_ok=True)
-        report_path.write_text(
-            json.dumps(report, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-
     _print_human_summary(report, report_path)
     return exit_code
 
@@ -77,6 +77,10 @@ create index if not exists ix_triage_sessions_stop_reason
     on public.triage_sessions(stop_reason);
 create index if not exists ix_triage_sessions_confidence
     on public.triage_sessions(confidence_0_1);
+-- Tuning report windows: range on created_at, filter/aggregate the rest.
+create index if not exists ix_triage_sessions_created_at_report
+    on public.triage_sessions(created_at desc)
+    include (envelope_type, confidence_0_1, recommended_specialty_id);
 
 create or replace function public.triage_set_updated_at()
 returns trigger
@@ -171,6 +175,9 @@ create index if not exists ix_triage_events_session_id
     on public.triage_events(session_id);
 create index if not exists ix_triage_events_created_at
     on public.triage_events(created_at desc);
+-- Report windows filter on created_at and a handful of event types.
+create index if not exists ix_triage_events_created_at_event_type
+    on public.triage_events(created_at desc, event_type);
 
 create or replace function public.triage_events_sync_legacy_columns()
 returns trigger
@@ -258,5 +265,116 @@ create index if not exists ix_triage_feedback_session_id
     on public.triage_feedback(session_id);
 create index if not exists ix_triage_feedback_created_at
     on public.triage_feedback(created_at desc);
+-- Tuning report joins feedback to sessions and splits by rating.
+create index if not exists ix_triage_feedback_session_id_rating
+    on public.triage_feedback(session_id, rating);
+create index if not exists ix_triage_feedback_created_at_rating
+    on public.triage_feedback(created_at desc, rating);
+
+-- One row per asked canonical, maintained from triage_sessions.asked_canonicals
+-- at write time so reports aggregate plain rows instead of unnesting jsonb.
+-- created_at is copied from the session so the report window is a range scan.
+create table if not exists public.triage_session_canonicals (
+    session_id uuid not null,
+    ord integer not null,
+    canonical text not null,
+    created_at timestamptz not null,
+    primary key (session_id, ord)
+);
+
+do $$
+begin
+    if not exists (
+        select 1
+        from pg_constraint
+        where conname = 'fk_triage_session_canonicals_session_id'
+    ) then
+        alter table public.triage_session_canonicals
+        add constraint fk_triage_session_canonicals_session_id
+        foreign key (session_id)
+        references public.triage_sessions(id)
+        on delete cascade;
+    end if;
+exception when others then
+    raise notice 'Skipping triage_session_canonicals FK creation: %', sqlerrm;
+end
+$$;
+
+create index if not exists ix_triage_session_canonicals_created_at
+    on public.triage_session_canonicals(created_at desc, canonical);
+
+create or replace function public.triage_sessions_sync_session_canonicals()
+returns trigger
+language plpgsql
+as $$
+begin
+    delete from public.triage_session_canonicals where session_id = new.id;
+
+    if jsonb_typeof(new.asked_canonicals) = 'array' then
+        insert into public.triage_session_canonicals (session_id, ord, canonical, created_at)
+        select new.id, c.ord, c.canonical, coalesce(new.created_at, now())
+        from jsonb_array_elements_text(new.asked_canonicals) with ordinality as c(canonical, ord);
+    end if;
+
+    return new;
+end;
+$$;
+
+drop trigger if exists trg_triage_sessions_sync_session_canonicals on public.triage_sessions;
+create trigger trg_triage_sessions_sync_session_canonicals
+after insert or update of asked_canonicals, created_at on public.triage_sessions
+for each row execute function public.triage_sessions_sync_session_canonicals();
+
+-- Backfill sessions written before the trigger existed.
+insert into public.triage_session_canonicals (session_id, ord, canonical, created_at)
+select s.id, c.ord, c.canonical, coalesce(s.created_at, now())
+from public.triage_sessions s
+cross join lateral jsonb_array_elements_text(s.asked_canonicals) with ordinality as c(canonical, ord)
+where jsonb_typeof(s.asked_canonicals) = 'array'
+  and not exists (
+      select 1 from public.triage_session_canonicals sc where sc.session_id = s.id
+  );
+
+-- Daily rollup of asked canonicals for the tuning report. Settled UTC days
+-- are aggregated once and then read back instead of re-unnesting
+-- asked_canonicals for every session in the report window.
+create table if not exists public.triage_daily_canonicals (
+    day date not null,
+    canonical text not null,
+    cnt bigint not null,
+    primary key (day, canonical)
+);
+
+-- Fills the rollup for [p_from, p_to). Days never seen are aggregated once.
+-- The last p_refresh_days days of the range are recomputed on every call,
+-- and rows that vanished are deleted, so late asked_canonicals updates and
+-- session deletes inside that window are picked up. Older days are NOT
+-- refreshed: after a bulk delete or backfill, call it once with a larger
+-- p_refresh_days (or truncate the table) to rebuild them.
+drop function if exists public.triage_fill_daily_canonicals(date, date);
+create or replace function public.triage_fill_daily_canonicals(
+    p_from date,
+    p_to date,
+    p_refresh_days integer default 7
+)
+returns void
+language sql
+as $$
+    delete from public.triage_daily_canonicals
+    where day >= greatest(p_from, p_to - p_refresh_days)
+      and day < p_to;
+
+    insert into public.triage_daily_canonicals (day, canonical, cnt)
+    select g.day::date, sc.canonical, count(*)
+    from generate_series(p_from::timestamp, p_to::timestamp - interval '1 day', interval '1 day') as g(day)
+    join public.triage_session_canonicals sc
+      on sc.created_at >= timezone('UTC', g.day)
+     and sc.created_at < timezone('UTC', g.day + interval '1 day')
+    where not exists (
+        select 1 from public.triage_daily_canonicals r where r.day = g.day::date
+    )
+    group by 1, 2
+    on conflict (day, canonical) do update set cnt = excluded.cnt;
+$$;
 
 commit;
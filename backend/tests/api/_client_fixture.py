@@ -0,0 +1,24 @@
+"""TestClient shared by the HTTP tests that go through the app lifespan.
+
+Entering the client runs the app lifespan (Redis probe, DB init); doing it
+once per test run instead of once per test keeps the suite fast. Patches and
+``app.dependency_overrides`` are read per request, so tests can still apply
+them around individual calls.
+"""
+
+from __future__ import annotations
+
+import atexit
+from functools import lru_cache
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@lru_cache(maxsize=1)
+def get_client() -> TestClient:
+    client = TestClient(app)
+    client.__enter__()
+    atexit.register(client.__exit__, None, None, None)
+    return client
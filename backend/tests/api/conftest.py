@@ -0,0 +1,9 @@
+"""pytest hooks for the HTTP lane. CI runs the suite with unittest; this only
+affects pytest runs, and lives here so `pytest tests/unit` never imports the
+FastAPI app."""
+
+
+def pytest_configure(config):
+    # Import the app (routers, models, runtime loaders) once up front so test
+    # collection only hits sys.modules and import cost is paid in one phase.
+    import app.main  # noqa: F401
@@ -3,10 +3,8 @@ from __future__ import annotations
 import unittest
 from unittest.mock import patch
 
-from fastapi.testclient import TestClient
-
 from app import admin_api
-from app.main import app
+from tests.api._client_fixture import get_client
 
 
 class _FakeResponse:
@@ -45,12 +43,15 @@ class _FakeSupabase:
 
 
 class AdminTuningAuthTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = get_client()
+
     def _post_from_session(self, headers: dict[str, str] | None = None):
-        with TestClient(app) as client:
-            return client.post(
-                "/v1/admin/tuning-tasks/from-session/session-1",
-                headers=headers or {},
-            )
+        return self.client.post(
+            "/v1/admin/tuning-tasks/from-session/session-1",
+            headers=headers or {},
+        )
 
     def test_returns_503_when_admin_key_missing(self):
         with patch("app.admin_auth.settings.ADMIN_API_KEY", ""):
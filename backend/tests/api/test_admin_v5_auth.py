@@ -3,10 +3,8 @@ from __future__ import annotations
 import unittest
 from unittest.mock import patch
 
-from fastapi.testclient import TestClient
-
 from app import admin_v5
-from app.main import app
+from tests.api._client_fixture import get_client
 
 
 class _FakeExecute:
@@ -42,9 +40,12 @@ class _FakeSupabase:
 
 
 class AdminV5AuthTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = get_client()
+
     def _get_sessions(self, headers: dict[str, str] | None = None):
-        with TestClient(app) as client:
-            return client.get("/admin/sessions?limit=1", headers=headers or {})
+        return self.client.get("/admin/sessions?limit=1", headers=headers or {})
 
     def test_returns_503_when_admin_key_missing(self):
         with patch("app.admin_auth.settings.ADMIN_API_KEY", ""):
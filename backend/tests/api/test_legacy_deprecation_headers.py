@@ -4,16 +4,18 @@ from types import SimpleNamespace
 import unittest
 from unittest.mock import patch
 
-from fastapi.testclient import TestClient
+from fastapi import Response
 
 from app.api.routes import session as session_routes
 from app.api.routes.legacy_deprecation import (
     DEPRECATION_HEADER_VALUE,
     SUCCESSOR_LINK_HEADER_VALUE,
     SUNSET_HEADER_VALUE,
+    apply_legacy_deprecation_headers,
 )
 from app.main import app
 from app.models.database import get_db
+from tests.api._client_fixture import get_client
 
 
 class _FakeDbSession:
@@ -27,35 +29,51 @@ class _FakeDbSession:
         return None
 
 
+# Stateless, so every request can share one instance.
+_SHARED_FAKE_DB = _FakeDbSession()
+
+
 async def _override_get_db():
-    yield _FakeDbSession()
+    yield _SHARED_FAKE_DB
+
+
+FAKE_EMERGENCY = SimpleNamespace(
+    action="emergency",
+    message="acil",
+    emergency=SimpleNamespace(
+        reason="Acil degerlendirme gerekli.",
+        emergency_instructions=["112'yi ara."],
+        missing_info_to_confirm=[],
+    ),
+)
+
+
+async def _fake_handle_initial_symptoms(*_args, **_kwargs):
+    return FAKE_EMERGENCY
 
 
 class LegacyDeprecationHeaderTests(unittest.TestCase):
-    def test_session_start_returns_deprecation_headers(self):
-        async def fake_handle_initial_symptoms(*_args, **_kwargs):
-            return SimpleNamespace(
-                action="emergency",
-                message="acil",
-                emergency=SimpleNamespace(
-                    reason="Acil degerlendirme gerekli.",
-                    emergency_instructions=["112'yi ara."],
-                    missing_info_to_confirm=[],
-                ),
-            )
+    def test_apply_legacy_deprecation_headers_sets_all_headers(self):
+        # Direct helper check: no ASGI stack needed for the header values.
+        response = Response()
+        apply_legacy_deprecation_headers(response)
+
+        self.assertEqual(response.headers["Deprecation"], DEPRECATION_HEADER_VALUE)
+        self.assertEqual(response.headers["Sunset"], SUNSET_HEADER_VALUE)
+        self.assertEqual(response.headers["Link"], SUCCESSOR_LINK_HEADER_VALUE)
 
+    def test_session_start_returns_deprecation_headers(self):
         app.dependency_overrides[get_db] = _override_get_db
         try:
             with patch.object(
                 session_routes.orchestrator,
                 "handle_initial_symptoms",
-                fake_handle_initial_symptoms,
+                _fake_handle_initial_symptoms,
             ):
-                with TestClient(app) as client:
-                    response = client.post(
-                        "/v1/session/start",
-                        json={"user_input_tr": "basim donuyor"},
-                    )
+                response = get_client().post(
+                    "/v1/session/start",
+                    json={"user_input_tr": "basim donuyor"},
+                )
         finally:
             app.dependency_overrides.clear()
 
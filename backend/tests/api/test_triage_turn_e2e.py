@@ -1,25 +1,55 @@
 """
 E2E-style tests for POST /v1/triage/turn.
-Uses TestClient; mocks internal handlers to get deterministic envelope responses.
+Drives the app in-process through httpx's ASGITransport; mocks internal handlers
+to get deterministic envelope responses.
 """
 from __future__ import annotations
 
+import asyncio
+import json
 import unittest
 from unittest.mock import patch
 from datetime import datetime, timezone
 
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 
-from app.main import app
 from app.api.routes import triage as triage_routes
-from app.models.schemas import Envelope, Meta
+from app.main import app
+from app.models.schemas import Envelope, Meta, TriageTurnRequest
+
+
+# Fixed timestamp keeps stub envelopes deterministic; nothing mutates it.
+_FIXED_META = Meta(
+    disclaimer_tr="Bu uygulama tanı koymaz; bilgilendirme ve yönlendirme amaçlıdır.",
+    timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+)
+
+
+def _turn_body(session_id: str | None, user_message: str) -> bytes:
+    return json.dumps(
+        {"session_id": session_id, "locale": "tr-TR", "user_message": user_message},
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+# Request bodies are encoded once at import instead of on every post.
+_HEADACHE_BODY = _turn_body(None, "3 gündür başım ağrıyor")
+_CHEST_PAIN_BODY = _turn_body(None, "göğsüm çok ağrıyor nefes alamıyorum")
+_MILD_COUGH_BODY = _turn_body(None, "hafif öksürük")
 
 
-def _make_meta():
-    return Meta(
-        disclaimer_tr="Bu uygulama tanı koymaz; bilgilendirme ve yönlendirme amaçlıdır.",
-        timestamp=datetime.now(timezone.utc),
-    )
+async def _post_turn(body: bytes, headers: dict | None = None):
+    # Same-thread ASGI dispatch: no TestClient portal thread or lifespan.
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(
+            "/v1/triage/turn",
+            content=body,
+            headers={"content-type": "application/json", **(headers or {})},
+        )
+
+
+def _turn(body: bytes, headers: dict | None = None):
+    return asyncio.run(_post_turn(body, headers))
 
 
 class TriageTurnE2ETests(unittest.TestCase):
@@ -38,7 +68,7 @@ class TriageTurnE2ETests(unittest.TestCase):
                 "doctor_ready_summary_tr": [],
                 "safety_notes_tr": [],
             },
-            meta=_make_meta(),
+            meta=_FIXED_META,
         )
 
         with patch.object(
@@ -46,15 +76,7 @@ class TriageTurnE2ETests(unittest.TestCase):
             "_handle_turn_supabase",
             return_value=stub,
         ), patch.object(triage_routes, "_has_supabase", return_value=True):
-            with TestClient(app) as client:
-                r = client.post(
-                    "/v1/triage/turn",
-                    json={
-                        "session_id": None,
-                        "locale": "tr-TR",
-                        "user_message": "3 gündür başım ağrıyor",
-                    },
-                )
+            r = _turn(_HEADACHE_BODY)
         self.assertEqual(r.status_code, 200, r.text)
         data = r.json()
         self.assertIn("type", data)
@@ -76,7 +98,7 @@ class TriageTurnE2ETests(unittest.TestCase):
                 "reason_tr": "Acil değerlendirme gerekli.",
                 "instructions_tr": ["112'yi arayın."],
             },
-            meta=_make_meta(),
+            meta=_FIXED_META,
         )
 
         with patch.object(
@@ -84,15 +106,7 @@ class TriageTurnE2ETests(unittest.TestCase):
             "_handle_turn_supabase",
             return_value=stub,
         ), patch.object(triage_routes, "_has_supabase", return_value=True):
-            with TestClient(app) as client:
-                r = client.post(
-                    "/v1/triage/turn",
-                    json={
-                        "session_id": None,
-                        "locale": "tr-TR",
-                        "user_message": "göğsüm çok ağrıyor nefes alamıyorum",
-                    },
-                )
+            r = _turn(_CHEST_PAIN_BODY)
         self.assertEqual(r.status_code, 200)
         data = r.json()
         self.assertEqual(data["type"], "EMERGENCY")
@@ -101,20 +115,12 @@ class TriageTurnE2ETests(unittest.TestCase):
 
     def test_turn_empty_input_with_session_returns_error_envelope(self):
         """session_id present but no user_message and no answer -> ERROR envelope."""
-        with TestClient(app) as client:
-            r = client.post(
-                "/v1/triage/turn",
-                json={
-                    "session_id": "existing-session-id",
-                    "locale": "tr-TR",
-                    "user_message": "",
-                },
-            )
-        self.assertEqual(r.status_code, 200)
-        data = r.json()
-        self.assertEqual(data["type"], "ERROR")
-        self.assertIn("payload", data)
-        self.assertIn("message_tr", data["payload"])
+        # Validation-only branch: call the handler directly, no ASGI round trip.
+        request = TriageTurnRequest(session_id="existing-session-id", locale="tr-TR", user_message="")
+        env = asyncio.run(triage_routes.triage_turn(request))
+        self.assertEqual(env.type, "ERROR")
+        self.assertEqual(env.payload["code"], "EMPTY_INPUT")
+        self.assertIn("message_tr", env.payload)
 
     def test_turn_rate_limit_headers_present(self):
         """Response includes X-RateLimit-* headers for /v1/triage/turn."""
@@ -129,23 +135,17 @@ class TriageTurnE2ETests(unittest.TestCase):
                 "doctor_ready_summary_tr": [],
                 "safety_notes_tr": [],
             },
-            meta=_make_meta(),
+            meta=_FIXED_META,
         )
         with patch.object(
             triage_routes,
             "_handle_turn_supabase",
             return_value=stub,
         ), patch.object(triage_routes, "_has_supabase", return_value=True):
-            with TestClient(app) as client:
-                r = client.post(
-                    "/v1/triage/turn",
-                    json={
-                        "session_id": None,
-                        "locale": "tr-TR",
-                        "user_message": "hafif öksürük",
-                    },
-                    headers={"x-device-id": "e2e-test-device"},
-                )
+            r = _turn(
+                _MILD_COUGH_BODY,
+                headers={"x-device-id": "e2e-test-device"},
+            )
         self.assertEqual(r.status_code, 200)
         self.assertIn("X-RateLimit-Limit", r.headers)
         self.assertIn("X-RateLimit-Remaining", r.headers)
@@ -0,0 +1,13 @@
+"""Runtime shared by every test class that needs the real app/data tree."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from app.runtime import Runtime, load_runtime
+
+
+@lru_cache(maxsize=1)
+def get_runtime() -> Runtime:
+    # Treat as read-only; tests that tweak attributes should copy.copy() it.
+    return load_runtime(data_dir="app/data")
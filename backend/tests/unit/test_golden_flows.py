@@ -1,23 +1,36 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import unittest
 
-from app.runtime import load_runtime
 from app.triage_engine import run_orchestrator_turn
+from tests.unit._runtime_fixture import get_runtime
+
+
+def _load_scenario(path: Path) -> tuple[str, dict]:
+    return path.name, json.loads(path.read_bytes())
 
 
 class GoldenFlowTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.runtime = load_runtime(data_dir="app/data")
-        cls.scenarios_dir = Path(__file__).resolve().parents[2] / "tests" / "golden_flows"
+        cls.runtime = get_runtime()
+        cls.scenarios_dir = Path(__file__).resolve().parents[3] / "tests" / "golden_flows"
+        scenario_files = sorted(cls.scenarios_dir.glob("*.json"))
+        cls.scenarios = []
+        if scenario_files:
+            # Scenario files are independent; overlap their reads/parses.
+            with ThreadPoolExecutor(max_workers=min(8, len(scenario_files))) as pool:
+                cls.scenarios = list(pool.map(_load_scenario, scenario_files))
 
     def _run_scenario(self, scenario: dict):
+        message_parts = []
         input_text = ""
         answers = {}
         asked_canonicals = []
+        asked_set = set()
 
         final_type = "ERROR"
         final_payload = {}
@@ -25,7 +38,8 @@ class GoldenFlowTests(unittest.TestCase):
         for turn_index, step in enumerate(scenario.get("input", []), start=1):
             user_message = str(step.get("user_message") or "").strip()
             if user_message:
-                input_text = (input_text + "\n" + user_message).strip()
+                message_parts.append(user_message)
+                input_text = "\n".join(message_parts)
 
             answer = step.get("answer")
             if isinstance(answer, dict):
@@ -33,7 +47,8 @@ class GoldenFlowTests(unittest.TestCase):
                 value = str(answer.get("value") or "").strip()
                 if canonical:
                     answers[canonical] = value
-                    if canonical not in asked_canonicals:
+                    if canonical not in asked_set:
+                        asked_set.add(canonical)
                         asked_canonicals.append(canonical)
 
             final_type, final_payload, _ = run_orchestrator_turn(
@@ -50,13 +65,11 @@ class GoldenFlowTests(unittest.TestCase):
         return final_type, final_payload
 
     def test_golden_flows(self):
-        scenario_files = sorted(self.scenarios_dir.glob("*.json"))
-        self.assertTrue(scenario_files, "No golden flow scenario files found.")
+        self.assertTrue(self.scenarios, "No golden flow scenario files found.")
 
-        for scenario_path in scenario_files:
-            scenario = json.loads(scenario_path.read_text(encoding="utf-8"))
+        for scenario_name, scenario in self.scenarios:
             expected = scenario.get("expected", {})
-            with self.subTest(scenario=scenario_path.name):
+            with self.subTest(scenario=scenario_name):
                 final_type, payload = self._run_scenario(scenario)
                 self.assertEqual(final_type, expected.get("final_type"))
 
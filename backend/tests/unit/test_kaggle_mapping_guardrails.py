@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from shutil import rmtree
+import tempfile
+import unittest
+
+from scripts.validate_kaggle_mapping import INPUT_FILES, run_validation
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _minimal_sources() -> dict:
+    return {
+        "synonyms": {
+            "synonyms": [
+                {"canonical": "c1", "variants_tr": ["v1"]},
+                {"canonical": "c2", "variants_tr": ["v2"]},
+            ]
+        },
+        "question_bank": {
+            "questions": [
+                {"canonical_symptom": "c1"},
+                {"canonical_symptom": "c2"},
+            ]
+        },
+        "specialty_keywords": {
+            "specialties": [
+                {
+                    "id": "internal",
+                    "keywords_tr": ["c1", "c2"],
+                    "negative_keywords_tr": [],
+                }
+            ]
+        },
+    }
+
+
+def _build_minimal_data_tree(tmp_path: Path) -> Path:
+    data_dir = tmp_path / "app" / "data"
+    for name, payload in _minimal_sources().items():
+        _write_json(data_dir / INPUT_FILES[name], payload)
+    return data_dir
+
+
+class KaggleMappingGuardrailTests(unittest.TestCase):
+    def _mk_workspace_tmp(self) -> Path:
+        # OS temp dir (tmpfs on most CI runners), removed even if the test fails.
+        case_path = Path(tempfile.mkdtemp(prefix="guardrails_"))
+        self.addCleanup(rmtree, case_path, ignore_errors=True)
+        return case_path
+
+    def test_guardrails_fail_on_unexpected_null(self):
+        tmp_path = self._mk_workspace_tmp()
+        report, exit_code, report_path = run_validation(
+            data_dir=tmp_path,
+            guardrails_config_path=tmp_path / "unused.json",
+            reports_dir=tmp_path / "reports",
+            preloaded={
+                **_minimal_sources(),
+                "disease_symptoms": {"DiseaseA": ["s1", "s2", "s3"]},
+                "kaggle_to_canonical": {"s1": "c1", "s2": None, "s3": "c2"},
+                "guardrails": {
+                    "null_allowlist": [],
+                    "coverage": {
+                        "min_total_symptoms": 3,
+                        "min_non_null_ratio_critical": 0.6,
+                    },
+                },
+            },
+        )
+
+        self.assertEqual(exit_code, 2)
+        self.assertEqual(report["status"], "fail")
+        self.assertTrue(report_path.exists())
+        checks = [x["check"] for x in report["critical_violations"]]
+        self.assertIn("null_allowlist", checks)
+
+    def test_guardrails_warn_on_collapse_but_pass(self):
+        tmp_path = self._mk_workspace_tmp()
+        report, exit_code, report_path = run_validation(
+            data_dir=tmp_path,
+            guardrails_config_path=tmp_path / "unused.json",
+            reports_dir=tmp_path / "reports",
+            preloaded={
+                **_minimal_sources(),
+                "disease_symptoms": {"DiseaseA": ["s1", "s2", "s3", "s4"]},
+                "kaggle_to_canonical": {"s1": "c1", "s2": "c1", "s3": "c1", "s4": "c1"},
+                "guardrails": {
+                    "null_allowlist": [],
+                    "coverage": {
+                        "min_total_symptoms": 3,
+                        "min_non_null_ratio_critical": 0.6,
+                    },
+                    "collapse": {
+                        "max_en_symptoms_per_canonical_warning": 2,
+                        "min_non_null_symptoms_for_disease_check": 3,
+                        "max_single_canonical_share_warning": 0.75,
+                    },
+                },
+            },
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(report["status"], "pass")
+        self.assertTrue(report_path.exists())
+        self.assertGreater(report["summary"]["warning_count"], 0)
+
+    def test_trust_normalized_matches_default_on_normalized_inputs(self):
+        # Goes through the on-disk loader, unlike the preloaded tests above.
+        tmp_path = self._mk_workspace_tmp()
+        data_dir = _build_minimal_data_tree(tmp_path)
+        _write_json(
+            data_dir / "kaggle_cache" / "disease_symptoms.json",
+            {"DiseaseA": ["s1", "s2", "s3"]},
+        )
+        _write_json(
+            data_dir / "kaggle_cache" / "kaggle_to_canonical.json",
+            {"s1": "c1", "s2": "c2", "s3": "c1"},
+        )
+        config_path = tmp_path / "config" / "kaggle_mapping_guardrails.json"
+        _write_json(config_path, {"null_allowlist": []})
+
+        reports = [
+            run_validation(
+                data_dir=data_dir,
+                guardrails_config_path=config_path,
+                reports_dir=tmp_path / "reports",
+                trust_normalized=trust,
+            )[0]
+            for trust in (False, True)
+        ]
+        for report in reports:
+            report.pop("generated_at")
+        self.assertEqual(reports[0], reports[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import unittest
+
+from scripts.preprocess_kaggle import normalize_symptom
+
+
+class NormalizeSymptomTests(unittest.TestCase):
+    def test_collapses_ascii_separators(self):
+        self.assertEqual(normalize_symptom("  Skin _ Rash\t"), "skin_rash")
+
+    def test_collapses_non_ascii_whitespace(self):
+        # Same result as the old re.sub(r"[\s_]+", "_", ...) implementation.
+        self.assertEqual(normalize_symptom("\u3000B_\u3000a"), "b_a")
+        self.assertEqual(
+            normalize_symptom("high fever\x1c_and chills\x85"),
+            "high_fever_and_chills",
+        )
+
+    def test_fixes_known_kaggle_typos(self):
+        self.assertEqual(normalize_symptom("dischromic _patches"), "dischromic_patches")
+
+
+if __name__ == "__main__":
+    unittest.main()
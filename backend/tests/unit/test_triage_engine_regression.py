@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import copy
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from time import perf_counter_ns
+import unittest
+
+from app.triage_engine import _generate_candidates, run_orchestrator_turn
+from tests.unit._runtime_fixture import get_runtime
+
+
+PERF_BASELINE_PATH = Path(__file__).resolve().parent / "perf" / "baseline.json"
+# Latency checks are noisy and slow; they run in the nightly perf job only.
+RUN_PERF_TESTS = os.environ.get("RUN_PERF_TESTS") == "1"
+# Checks that need extra full triage turns; also nightly only.
+RUN_SLOW_TESTS = os.environ.get("RUN_SLOW_TESTS") == "1"
+# Rewrite the baseline from this run instead of gating on it (after an
+# intentional performance change; runner speed is normalized away).
+PERF_UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+# p95 may grow to this multiple of the baseline ratio before the check fails.
+PERF_TOLERANCE = 1.5
+
+UTI_TEXT = "idrar yaparken yan\u0131yor, \u00e7ok s\u0131k idrara \u00e7\u0131k\u0131yorum"
+DIZZINESS_NAUSEA_TEXT = "ba\u015f\u0131m d\u00f6n\u00fcyor, midem bulan\u0131yor"
+CHEST_EMERGENCY_TEXT = "g\u00f6\u011fs\u00fcmde bask\u0131 var, nefesim dar"
+REPEAT_TEXT = "idrar yanmas\u0131 ve s\u0131k idrara \u00e7\u0131kma var"
+
+# Payload keys each envelope type must carry (see run_orchestrator_turn).
+REQUIRED_PAYLOAD_KEYS = {
+    "EMERGENCY": {"urgency", "reason_tr", "instructions_tr"},
+    "RESULT": {
+        "urgency",
+        "recommended_specialty",
+        "top_conditions",
+        "confidence_0_1",
+        "stop_reason",
+        "doctor_ready_summary_tr",
+        "safety_notes_tr",
+        "_meta",
+    },
+    "QUESTION": {"question_id", "canonical", "question_tr", "answer_type", "_meta"},
+}
+
+
+def _percentile_ns(sorted_ns: list[int], pct: float) -> int:
+    return sorted_ns[max(0, int(len(sorted_ns) * pct) - 1)]
+
+
+def _calibration_work() -> int:
+    # Fixed pure-Python load (string building, hashing, sorting) that scales
+    # with interpreter speed the same way a triage turn does.
+    table = {str(i * 7919 % 10007): i for i in range(4000)}
+    return len(sorted(table, key=len))
+
+
+def _first_turn(runtime, input_text: str):
+    return run_orchestrator_turn(
+        runtime=runtime,
+        input_text=input_text,
+        answers={},
+        asked_canonicals=[],
+        turn_index=1,
+    )
+
+
+class TriageEngineRegressionTests(unittest.TestCase):
+    _turns: dict[str, tuple] = {}
+
+    @property
+    def runtime(self):
+        # Loaded on first use, so a fully skipped class never parses app/data.
+        return get_runtime()
+
+    def _turn(self, input_text: str):
+        # First turns are deterministic, so each text runs once per class.
+        if input_text not in self._turns:
+            self._turns[input_text] = _first_turn(self.runtime, input_text)
+        return self._turns[input_text]
+
+    def test_uti_text_returns_result(self):
+        envelope_type, payload, _ = self._turn(UTI_TEXT)
+
+        self.assertEqual(envelope_type, "RESULT")
+        self.assertEqual(payload["recommended_specialty"]["id"], "urology_internal")
+        top_conditions = payload.get("top_conditions") or []
+        self.assertTrue(top_conditions)
+        first = top_conditions[0]
+        self.assertIsInstance(description := first.get("disease_description"), str)
+        self.assertTrue(description.strip())
+
+    def test_missing_description_map_does_not_break_result_path(self):
+        # Shallow copy so the shared runtime keeps its descriptions.
+        runtime = copy.copy(self.runtime)
+        runtime.disease_descriptions_en = {}
+        envelope_type, payload, _ = _first_turn(runtime, UTI_TEXT)
+
+        self.assertEqual(envelope_type, "RESULT")
+        top_conditions = payload.get("top_conditions") or []
+        self.assertTrue(top_conditions)
+        self.assertTrue(
+            all(
+                "disease_description" not in condition
+                for condition in top_conditions
+                if isinstance(condition, dict)
+            )
+        )
+
+    def test_dizziness_nausea_no_crash_valid_envelope(self):
+        envelope_type, payload, _ = self._turn(DIZZINESS_NAUSEA_TEXT)
+
+        self.assertIn(envelope_type, {"QUESTION", "RESULT"})
+        self.assertIsInstance(payload, dict)
+        if envelope_type == "QUESTION":
+            self.assertTrue(payload.get("question_tr"))
+        if envelope_type == "RESULT":
+            self.assertTrue(payload.get("recommended_specialty", {}).get("id"))
+
+    def test_chest_emergency(self):
+        envelope_type, payload, _ = self._turn(CHEST_EMERGENCY_TEXT)
+
+        self.assertEqual(envelope_type, "EMERGENCY")
+        self.assertEqual(payload.get("urgency"), "EMERGENCY")
+
+    def test_null_map_does_not_crash_in_candidate_generation(self):
+        fake_runtime = SimpleNamespace(
+            disease_to_trcanonicals={"MockDisease": {"ba\u015f a\u011fr\u0131s\u0131"}},
+            symptom_map_en_to_tr={
+                "headache": "ba\u015f a\u011fr\u0131s\u0131",
+                "family_history": None,
+            },
+            symptom_severity_en={"headache": 4},
+            canonical_to_en_symptoms={"ba\u015f a\u011fr\u0131s\u0131": ["headache"]},
+        )
+
+        candidates = _generate_candidates(
+            user_canonicals_tr=["ba\u015f a\u011fr\u0131s\u0131"],
+            runtime=fake_runtime,
+            top_n=3,
+        )
+
+        self.assertTrue(candidates)
+        self.assertEqual(candidates[0]["disease_label"], "MockDisease")
+
+    def test_result_shape_stable(self):
+        envelope = self._turn(REPEAT_TEXT)
+        # No default= hook: a non-JSON value anywhere in the envelope fails here.
+        json.dumps(envelope, sort_keys=True)
+        envelope_type, payload, debug_patch = envelope
+        self.assertIn(envelope_type, REQUIRED_PAYLOAD_KEYS)
+        self.assertLessEqual(REQUIRED_PAYLOAD_KEYS[envelope_type], payload.keys())
+        self.assertIn("stop_reason", debug_patch)
+        self.assertIn("user_canonicals_tr", debug_patch)
+
+    @unittest.skipUnless(RUN_SLOW_TESTS, "set RUN_SLOW_TESTS=1 to run the double-turn check")
+    def test_deterministic_same_input_same_output(self):
+        # Compare the cached turn against a fresh run, not against itself.
+        first = self._turn(REPEAT_TEXT)
+        second = _first_turn(self.runtime, REPEAT_TEXT)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, second)
+
+    @unittest.skipUnless(RUN_PERF_TESTS, "set RUN_PERF_TESTS=1 to run latency checks")
+    def test_local_p95_response_time_smoke(self):
+        baselines = json.loads(PERF_BASELINE_PATH.read_text(encoding="utf-8"))
+        baseline = baselines["test_local_p95_response_time_smoke"]
+        kwargs = dict(
+            runtime=self.runtime,
+            input_text=baseline["input_text"],
+            answers={},
+            asked_canonicals=[],
+            turn_index=1,
+        )
+        for _ in range(5):
+            run_orchestrator_turn(**kwargs)
+
+        # Interleave calibration with the samples so both see the same
+        # CPU frequency and neighbour noise.
+        samples = []
+        calibration = []
+        for _ in range(int(baseline["samples"])):
+            start = perf_counter_ns()
+            _calibration_work()
+            calibration.append(perf_counter_ns() - start)
+            start = perf_counter_ns()
+            run_orchestrator_turn(**kwargs)
+            samples.append(perf_counter_ns() - start)
+
+        calibration.sort()
+        calibration_ns = calibration[len(calibration) // 2]
+        samples.sort()
+        p50_ms = samples[len(samples) // 2] / 1e6
+        p95_ms = _percentile_ns(samples, 0.95) / 1e6
+        p99_ms = _percentile_ns(samples, 0.99) / 1e6
+        # Baselines are stored as multiples of the calibration time, so the
+        # same file gates a laptop and a CI runner.
+        ratios = {
+            "p50_ratio": round(samples[len(samples) // 2] / calibration_ns, 3),
+            "p95_ratio": round(_percentile_ns(samples, 0.95) / calibration_ns, 3),
+            "p99_ratio": round(_percentile_ns(samples, 0.99) / calibration_ns, 3),
+        }
+
+        report_path = os.environ.get("PERF_REPORT_PATH")
+        if report_path:
+            Path(report_path).write_text(
+                json.dumps(
+                    {
+                        "test": "test_local_p95_response_time_smoke",
+                        "samples_ns": samples,
+                        "p50_ms": p50_ms,
+                        "p95_ms": p95_ms,
+                        "p99_ms": p99_ms,
+                        "calibration_ms": calibration_ns / 1e6,
+                        **ratios,
+                        "baseline": baseline,
+                    },
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+
+        if PERF_UPDATE_BASELINE:
+            baseline.update(ratios)
+            PERF_BASELINE_PATH.write_text(
+                json.dumps(baselines, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+            )
+            return
+
+        self.assertLessEqual(
+            ratios["p95_ratio"],
+            PERF_TOLERANCE * float(baseline["p95_ratio"]),
+            f"p95 {p95_ms:.2f}ms = {ratios['p95_ratio']}x calibration "
+            f"({calibration_ns / 1e6:.2f}ms) regressed past {PERF_TOLERANCE}x baseline "
+            f"ratio {baseline['p95_ratio']} (p50 {p50_ms:.2f}ms, p99 {p99_ms:.2f}ms)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()